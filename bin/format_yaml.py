@@ -2,16 +2,24 @@
 """Format YAML files using ruamel.yaml preserving comments.
 
 Usage:
-  format_yaml.py [--check] [--apply] [paths...]
+  format_yaml.py [--check] [--apply] [--lint] [--watch | --serve] [paths...]
 
 Default: if no paths provided, will search repo for .yml/.yaml files.
 --check: don't write files, just report which files would change and exit 1 if any
 --apply: write changes in-place (backing up to <file>.bak)
+--lint: also run the .yamllint.yml rules we rely on (line-length, indentation, truthy,
+        trailing-spaces, document-start) on the same parse; exit 1 on lint errors
+--watch: keep running and process files whenever they change (mtime polling)
+--serve: keep ruamel loaded and handle format_yaml_client.py requests over a Unix socket
 """
 from pathlib import Path
 import sys
 import argparse
+import fnmatch
+import os
+import re
 import shutil
+import time
 
 try:
     from ruamel.yaml import YAML
@@ -45,11 +53,204 @@ def normalize_text(txt: str) -> str:
     return '\n'.join(lines) + '\n'
 
 
-def format_file(p: Path, yaml, apply_changes=False):
+# Defaults of the yamllint `default` preset for the rules implemented below
+LINT_DEFAULTS = {
+    'line-length': {'level': 'error', 'max': 80, 'allow-non-breakable-words': True},
+    'indentation': {'level': 'error', 'indent-sequences': True},
+    'truthy': {'level': 'warning', 'allowed-values': ['true', 'false'], 'check-keys': True},
+    'trailing-spaces': {'level': 'error'},
+    'document-start': {'level': 'warning', 'present': True},
+}
+
+TRUTHY_VALUES = {
+    'YES', 'Yes', 'yes', 'NO', 'No', 'no', 'TRUE', 'True', 'true',
+    'FALSE', 'False', 'false', 'ON', 'On', 'on', 'OFF', 'Off', 'off',
+}
+
+
+def find_lint_config(start: Path):
+    """Locate the yamllint config in start or one of its parents."""
+    for directory in [start, *start.parents]:
+        for name in ('.yamllint', '.yamllint.yaml', '.yamllint.yml'):
+            if (directory / name).is_file():
+                return directory / name
+    return None
+
+
+def load_lint_config(path, yaml):
+    """Merge the yamllint config at path over LINT_DEFAULTS.
+
+    Returns {'rules': {rule: options}, 'ignore': [patterns]}; disabled rules are dropped.
+    Only rules implemented here are read, anything else in the config is ignored.
+    """
+    rules = {name: dict(options) for name, options in LINT_DEFAULTS.items()}
+    ignore = []
+    if path is not None:
+        conf = yaml.load(path.read_text()) or {}
+        for name, options in (conf.get('rules') or {}).items():
+            if name not in rules:
+                continue
+            if options == 'disable':
+                del rules[name]
+            elif isinstance(options, dict):
+                rules[name].update(options)
+        ignore = [line.strip() for line in str(conf.get('ignore') or '').splitlines() if line.strip()]
+    return {'rules': rules, 'ignore': ignore}
+
+
+def lint_ignored(p: Path, lint_config) -> bool:
+    """gitignore-style match of the config's `ignore` patterns (as yamllint does)."""
+    rel = p.as_posix()
+    rel = rel[2:] if rel.startswith('./') else rel
+    for pattern in lint_config['ignore']:
+        pattern = pattern.rstrip('/')
+        if pattern.startswith('/'):
+            if fnmatch.fnmatch(rel, pattern[1:]) or fnmatch.fnmatch(rel, pattern[1:] + '/*'):
+                return True
+        elif any(fnmatch.fnmatch(part, pattern) for part in [rel, *rel.split('/')]) or \
+                fnmatch.fnmatch(rel, '*/' + pattern) or fnmatch.fnmatch(rel, pattern + '/*'):
+            return True
+    return False
+
+
+def problem(rules, rule, line, col, message):
+    """(line, column, level, message, rule) with 1-based positions."""
+    return (line + 1, col + 1, rules[rule]['level'], message, rule)
+
+
+def lint_text(lines, rules):
+    """Rules that only need the raw lines."""
+    problems = []
+    if 'trailing-spaces' in rules:
+        for i, line in enumerate(lines):
+            stripped = line.rstrip(' \t')
+            if stripped != line:
+                problems.append(problem(rules, 'trailing-spaces', i, len(stripped), 'trailing spaces'))
+
+    if 'line-length' in rules:
+        opts = rules['line-length']
+        for i, line in enumerate(lines):
+            if len(line) <= opts['max']:
+                continue
+            # A single long word (URL, hash...) optionally behind `- ` or `# ` can't be wrapped
+            words = re.sub(r'^\s*(?:- |#+ *)?', '', line).strip()
+            if opts.get('allow-non-breakable-words', True) and words and ' ' not in words:
+                continue
+            problems.append(problem(rules, 'line-length', i, opts['max'],
+                                    f"line too long ({len(line)} > {opts['max']} characters)"))
+
+    if 'document-start' in rules and rules['document-start'].get('present', True):
+        for i, line in enumerate(lines):
+            s = line.strip()
+            if not s or s.startswith('#') or s.startswith('%'):
+                continue
+            if not s.startswith('---'):
+                problems.append(problem(rules, 'document-start', i, 0, 'missing document start "---"'))
+            break
+    return problems
+
+
+def lint_tree(data, lines, rules):
+    """Rules that need the parsed document: indentation and truthy, using ruamel's node positions."""
+    from ruamel.yaml.comments import CommentedMap, CommentedSeq
+
+    problems = []
+    indent_unit = []  # first indentation width seen (yamllint `spaces: consistent`)
+    allowed = set(rules.get('truthy', {}).get('allowed-values', []))
+
+    def check_truthy(value, line, col, is_key=False):
+        if 'truthy' not in rules or (is_key and not rules['truthy'].get('check-keys', True)):
+            return
+        # Quoted scalars keep a ScalarString type with preserve_quotes; only plain scalars matter
+        if type(value) not in (bool, str):
+            return
+        token = re.match(r'[^\s,:#\]}]*', lines[line][col:]).group(0)
+        if token in TRUTHY_VALUES and token not in allowed:
+            problems.append(problem(rules, 'truthy', line, col,
+                                    f"truthy value should be one of [{', '.join(sorted(allowed))}]"))
+
+    def check_indent(parent_col, line, col):
+        if 'indentation' not in rules:
+            return
+        found = col - parent_col
+        if not indent_unit:
+            if found > 0:
+                indent_unit.append(found)
+            return
+        if found != indent_unit[0]:
+            problems.append(problem(rules, 'indentation', line, col,
+                                    f'wrong indentation: expected {parent_col + indent_unit[0]} but found {col}'))
+
+    def dash_column(line, col):
+        """Column of the `- ` introducing a sequence item that starts at (line, col)."""
+        text = lines[line][:col].rstrip()
+        return len(text) - 1 if text.endswith('-') else None
+
+    def is_block(node):
+        return not node.fa.flow_style() and len(node) > 0
+
+    def own_keys(node):
+        """Keys written in this map; keys pulled in through a `<<` merge have no position here."""
+        return [key for key in node if key in (node.lc.data or {})]
+
+    visited = set()
+
+    def walk(node):
+        # Aliases (`*base`) point at the anchored node; lint it only where it is written
+        if id(node) in visited:
+            return
+        visited.add(id(node))
+        if isinstance(node, CommentedMap):
+            for key in own_keys(node):
+                value = node[key]
+                key_line, key_col = node.lc.key(key)
+                check_truthy(key, key_line, key_col, is_key=True)
+                if isinstance(value, CommentedMap) and is_block(value):
+                    child_keys = own_keys(value)
+                    child_line, child_col = value.lc.key(child_keys[0]) if child_keys else (key_line, key_col)
+                    if child_line > key_line:
+                        check_indent(key_col, child_line, child_col)
+                elif isinstance(value, CommentedSeq) and is_block(value):
+                    item_line, item_col = value.lc.item(0)
+                    dash = dash_column(item_line, item_col)
+                    if dash is not None and item_line > key_line:
+                        if dash == key_col and rules.get('indentation', {}).get('indent-sequences', True):
+                            problems.append(problem(rules, 'indentation', item_line, dash,
+                                                    f'wrong indentation: expected {key_col + (indent_unit or [2])[0]} '
+                                                    f'but found {dash}'))
+                        elif dash != key_col:
+                            check_indent(key_col, item_line, dash)
+                elif not isinstance(value, (CommentedMap, CommentedSeq)):
+                    value_line, value_col = node.lc.value(key)
+                    check_truthy(value, value_line, value_col)
+                walk(value)
+        elif isinstance(node, CommentedSeq):
+            for i, item in enumerate(node):
+                if not isinstance(item, (CommentedMap, CommentedSeq)):
+                    item_line, item_col = node.lc.item(i)
+                    check_truthy(item, item_line, item_col)
+                walk(item)
+
+    walk(data)
+    return problems
+
+
+def lint_document(text, data, lint_config):
+    """Run all enabled rules; data is None when the file has no YAML content."""
+    rules = lint_config['rules']
+    lines = text.splitlines()
+    problems = lint_text(lines, rules)
+    if data is not None:
+        problems += lint_tree(data, lines, rules)
+    return sorted(problems)
+
+
+def format_file(p: Path, yaml, apply_changes=False, lint_config=None):
+    """Returns (changed, message, lint problems); problems are only collected when lint_config is set."""
     try:
         original = p.read_text()
     except Exception as e:
-        return False, f'read error: {e}'
+        return False, f'read error: {e}', []
 
     # If file is comments or blank only, skip it (preserve comments)
     def is_comment_or_blank(text: str) -> bool:
@@ -63,13 +264,17 @@ def format_file(p: Path, yaml, apply_changes=False):
         return True
 
     if is_comment_or_blank(original):
-        return False, 'comments/blank - skipped'
+        problems = lint_document(original, None, lint_config) if lint_config else []
+        return False, 'comments/blank - skipped', problems
 
     # Load preserving comments
     try:
         data = yaml.load(original)
     except Exception as e:
-        return False, f'parse error: {e}'
+        return False, f'parse error: {e}', []
+
+    # Lint from the same parse the formatter uses
+    problems = lint_document(original, data, lint_config) if lint_config else []
 
     # Dump to string
     from io import StringIO
@@ -78,68 +283,265 @@ def format_file(p: Path, yaml, apply_changes=False):
     new_txt = buf.getvalue()
 
     if normalize_text(original) == normalize_text(new_txt):
-        return False, 'no change'
+        return False, 'no change', problems
 
     if apply_changes:
         bak = p.with_suffix(p.suffix + '.bak')
         shutil.copy2(p, bak)
         p.write_text(new_txt)
-        return True, 'applied'
+        return True, 'applied', problems
     else:
-        return True, 'would change'
-
+        return True, 'would change', problems
 
-def main(argv):
-    parser = argparse.ArgumentParser()
-    parser.add_argument('--check', action='store_true', help='Do not write files; exit 1 if changes required')
-    parser.add_argument('--apply', action='store_true', help='Write changes in-place')
-    parser.add_argument('paths', nargs='*')
-    args = parser.parse_args(argv[1:])
 
+def make_yaml():
     yaml = YAML()
     yaml.indent(mapping=2, sequence=4, offset=2)
     yaml.preserve_quotes = True
     yaml.width = 4096
+    return yaml
+
+
+_lint_config_cache = {}
 
-    files = collect_files(args.paths)
-    if not files:
-        print('No YAML files found')
-        return 0
+
+def lint_config_for(start: Path, yaml):
+    """Lint config for files under start, reloaded only when .yamllint.yml changes (watch/serve)."""
+    path = find_lint_config(start)
+    key = (path, path.stat().st_mtime if path else None)
+    if key not in _lint_config_cache:
+        _lint_config_cache.clear()
+        _lint_config_cache[key] = load_lint_config(path, yaml)
+    return _lint_config_cache[key]
+
+
+def run_files(files, yaml, check=False, apply=False, lint=False, out=None):
+    """Format/lint files and print the report to out. Returns the exit code."""
+    out = out or sys.stdout
+    lint_config = lint_config_for(Path.cwd(), yaml) if lint else None
 
     changed_any = False
+    lint_errors = 0
     errors = []
     for f in files:
-        ok, msg = format_file(f, yaml, apply_changes=args.apply)
+        file_lint = lint_config if lint_config and not lint_ignored(f, lint_config) else None
+        ok, msg, problems = format_file(f, yaml, apply_changes=apply, lint_config=file_lint)
+        for line, col, level, desc, rule in problems:
+            print(f'{f}:{line}:{col}: [{level}] {desc} ({rule})', file=out)
+            if level == 'error':
+                lint_errors += 1
+
         # treat comments/blank as informational
         if msg == 'comments/blank - skipped':
-            print(f'{f}: {msg}')
+            print(f'{f}: {msg}', file=out)
             continue
 
         if ok:
             changed_any = True
-            print(f'{f}: {msg}')
+            print(f'{f}: {msg}', file=out)
         else:
             if msg not in ('no change',):
                 errors.append((f, msg))
-            print(f'{f}: {msg}')
+            print(f'{f}: {msg}', file=out)
 
     if errors:
-        print('\nErrors:')
+        print('\nErrors:', file=out)
         for f, m in errors:
-            print(f'  {f}: {m}')
+            print(f'  {f}: {m}', file=out)
         return 2
 
-    if args.check and changed_any:
-        print('\nFormatting check failed; files would be changed')
+    if lint_errors:
+        print(f'\nLint failed; {lint_errors} error(s)', file=out)
+        return 1
+
+    if check and changed_any:
+        print('\nFormatting check failed; files would be changed', file=out)
         return 1
 
-    if args.apply and changed_any:
-        print('\nFormatting applied')
+    if apply and changed_any:
+        print('\nFormatting applied', file=out)
     elif not changed_any:
-        print('\nAll files already formatted')
+        print('\nAll files already formatted', file=out)
+
+    return 0
+
+
+def watch(paths, yaml, check=False, apply=False, lint=False, interval=0.5):
+    """Poll the YAML files under paths and process each one when its mtime changes."""
+    def snapshot(files):
+        mtimes = {}
+        for f in files:
+            try:
+                mtimes[f] = f.stat().st_mtime_ns
+            except OSError:
+                pass
+        return mtimes
+
+    files = collect_files(paths)
+    mtimes = snapshot(files)
+    print(f'Watching {len(files)} YAML file(s); Ctrl-C to stop')
+    tick = 0
+    try:
+        while True:
+            time.sleep(interval)
+            tick += 1
+            # Re-glob now and then to pick up new files; stat the known ones every tick
+            if tick % 20 == 0:
+                files = collect_files(paths)
+            current = snapshot(files)
+            changed = [f for f, mtime in current.items() if mtimes.get(f) != mtime]
+            if changed:
+                run_files(changed, yaml, check=check, apply=apply, lint=lint)
+                sys.stdout.flush()
+                # --apply rewrites the file; don't treat our own write as a new change
+                current.update(snapshot(changed))
+            mtimes = current
+    except KeyboardInterrupt:
+        return 0
+
+
+def default_socket_path() -> Path:
+    """Per-user socket for --serve; keep in sync with format_yaml_client.py.
+
+    Without XDG_RUNTIME_DIR (macOS), use a 0700 directory under $TMPDIR (per-user on
+    macOS) so other local users can't bind a look-alike socket first.
+    """
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return Path(runtime_dir) / f'format_yaml-{os.getuid()}.sock'
+    return Path(os.environ.get('TMPDIR') or '/tmp') / f'format_yaml-{os.getuid()}' / 'server.sock'
+
+
+def serve(socket_path: Path, yaml, parser):
+    """Keep ruamel loaded and answer format_yaml_client.py requests over a Unix socket.
+
+    Request: one JSON line {"cwd": ..., "argv": [...]} using this script's normal arguments.
+    Response: one JSON line {"output": ..., "exit": ...}.
+    """
+    # Only the long-running server needs these; keep one-shot runs lean
+    import contextlib
+    import io
+    import json
+    import signal
+    import socket
+    import socketserver
+
+    import stat
+
+    # Another user must not be able to own or swap the socket: its directory has to be
+    # ours or sticky (like /tmp), and an existing socket has to be ours
+    socket_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    parent = socket_path.parent.stat()
+    if parent.st_uid != os.getuid() and not parent.st_mode & stat.S_ISVTX:
+        print(f'refusing to serve: {socket_path.parent} is owned by another user')
+        return 1
+    if socket_path.exists() and socket_path.lstat().st_uid != os.getuid():
+        print(f'refusing to serve: {socket_path} is owned by another user')
+        return 1
+
+    if socket_path.exists():
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(socket_path))
+            print(f'format_yaml server already running on {socket_path}')
+            return 1
+        except OSError:
+            socket_path.unlink()  # stale socket from a server that died
+        finally:
+            probe.close()
 
+    class Handler(socketserver.StreamRequestHandler):
+        timeout = 10  # seconds; the server is single-threaded, so a stalled client must not block it
+
+        def handle(self):
+            out = io.StringIO()
+            request = {}
+            try:
+                line = self.rfile.readline()
+            except (TimeoutError, socket.timeout):
+                return
+            try:
+                request = json.loads(line)
+                # -h and argparse errors print and exit; send both back to the client
+                with contextlib.redirect_stdout(out), contextlib.redirect_stderr(out):
+                    args = parser.parse_args(request['argv'])
+                if args.serve or args.watch:
+                    raise ValueError('--serve/--watch are not available through the client')
+                cwd = os.getcwd()
+                os.chdir(request['cwd'])
+                try:
+                    files = collect_files(args.paths)
+                    if files:
+                        code = run_files(files, yaml, check=args.check, apply=args.apply, lint=args.lint, out=out)
+                    else:
+                        print('No YAML files found', file=out)
+                        code = 0
+                finally:
+                    os.chdir(cwd)
+            except SystemExit as e:  # argparse error, message already in out
+                code = e.code if isinstance(e.code, int) else 2
+            except Exception as e:
+                print(f'server error: {e}', file=out)
+                code = 2
+            if request.get('raw'):
+                # format_yaml_client.py: exit code line, then the output until EOF (no json import needed)
+                self.wfile.write(f'{code}\n{out.getvalue()}'.encode())
+            else:
+                self.wfile.write((json.dumps({'output': out.getvalue(), 'exit': code}) + '\n').encode())
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)  # clean up the socket on `kill` too
+
+    with socketserver.UnixStreamServer(str(socket_path), Handler) as server:
+        os.chmod(socket_path, 0o600)
+        print(f'format_yaml server listening on {socket_path}; Ctrl-C to stop')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
     return 0
 
 
+def build_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--check', action='store_true', help='Do not write files; exit 1 if changes required')
+    parser.add_argument('--apply', action='store_true', help='Write changes in-place')
+    parser.add_argument('--lint', action='store_true',
+                        help='Also check yamllint rules (from .yamllint.yml) in the same pass; exit 1 on errors')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and process files as they change (polling)')
+    parser.add_argument('--interval', type=float, default=0.5, help='Polling interval for --watch in seconds')
+    parser.add_argument('--serve', action='store_true',
+                        help='Keep running and handle format_yaml_client.py requests over a Unix socket')
+    parser.add_argument('--socket', type=Path, default=None,
+                        help='Socket path for --serve (default: $XDG_RUNTIME_DIR or /tmp)')
+    parser.add_argument('paths', nargs='*')
+    return parser
+
+
+def main(argv):
+    parser = build_parser()
+    args = parser.parse_args(argv[1:])
+
+    yaml = make_yaml()
+
+    if args.serve:
+        return serve(args.socket or default_socket_path(), yaml, build_parser())
+
+    if args.watch:
+        return watch(args.paths, yaml, check=args.check, apply=args.apply, lint=args.lint, interval=args.interval)
+
+    files = collect_files(args.paths)
+    if not files:
+        print('No YAML files found')
+        return 0
+
+    return run_files(files, yaml, check=args.check, apply=args.apply, lint=args.lint)
+
+
 if __name__ == '__main__':
     raise SystemExit(main(sys.argv))
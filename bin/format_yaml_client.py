@@ -0,0 +1,80 @@
+#!/usr/bin/env -S python3 -I -S
+"""Send a format_yaml.py request to a running `format_yaml.py --serve` process.
+
+Usage:
+  format_yaml_client.py [--check] [--apply] [--lint] [paths...]
+
+Takes the same arguments as format_yaml.py and prints the same output, but skips
+the ruamel import and YAML setup by handing the paths to the warm server over a
+Unix socket. Falls back to running format_yaml.py directly when no server is up.
+
+Startup is most of this client's cost, so it runs without site (-I -S) and only
+uses builtin modules: `_socket` instead of socket, no json or pathlib.
+"""
+import _socket
+import os
+import sys
+
+
+def default_socket_path() -> str:
+    """Per-user socket; keep in sync with format_yaml.py."""
+    runtime_dir = os.environ.get('XDG_RUNTIME_DIR')
+    if runtime_dir:
+        return os.path.join(runtime_dir, f'format_yaml-{os.getuid()}.sock')
+    return os.path.join(os.environ.get('TMPDIR') or '/tmp', f'format_yaml-{os.getuid()}', 'server.sock')
+
+
+def run_locally(argv):
+    script = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'format_yaml.py')
+    os.execv(sys.executable, [sys.executable, script, *argv[1:]])
+
+
+def json_string(value: str) -> str:
+    """Encode a str as a JSON string literal."""
+    escaped = value.replace('\\', '\\\\').replace('"', '\\"')
+    return '"' + ''.join(c if c >= ' ' else f'\\u{ord(c):04x}' for c in escaped) + '"'
+
+
+def main(argv):
+    socket_path = os.environ.get('FORMAT_YAML_SOCKET') or default_socket_path()
+
+    # A socket created by another user could answer with any output and exit code
+    try:
+        owner = os.stat(socket_path).st_uid
+    except OSError:
+        run_locally(argv)
+    if owner != os.getuid():
+        sys.stderr.write(f'format_yaml_client: ignoring {socket_path} (owned by uid {owner})\n')
+        run_locally(argv)
+
+    sock = _socket.socket(_socket.AF_UNIX, _socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        run_locally(argv)
+
+    request = '{"cwd": %s, "argv": [%s], "raw": true}\n' % (
+        json_string(os.getcwd()), ', '.join(json_string(arg) for arg in argv[1:]))
+
+    chunks = []
+    try:
+        sock.sendall(request.encode('utf-8', 'surrogateescape'))
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    finally:
+        sock.close()
+
+    code, _, output = b''.join(chunks).partition(b'\n')
+    if not code.isdigit():  # server could not decode the request and replied in JSON
+        sys.stdout.buffer.write(code + b'\n' + output)
+        return 2
+    sys.stdout.buffer.write(output)
+    return int(code)
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv))
@@ -12,6 +12,7 @@ import os
 import re
 import subprocess
 import sys
+import time
 from pathlib import Path
 from typing import Dict, List, Set, Tuple
 
@@ -194,11 +195,121 @@ class ConfigParser:
         return packages, config
 
 
+class TemplateDependencyIndex:
+    """Map .chezmoidata.yaml keys to the chezmoi targets whose templates read them."""
+
+    DATA_KEYS = ('platform_packages', 'cli_tools', 'languages')
+
+    # `.platform_packages.darwin`, `(index .platform_packages.linux.debian "essential")`, `.cli_tools`, ...
+    REFERENCE_RE = re.compile(
+        r'(index\s+)?\.(' + '|'.join(DATA_KEYS) + r')((?:\.[A-Za-z0-9_]+)*)((?:\s+"[^"]+")*)'
+    )
+
+    # `include "file"` of a non-template file (e.g. `include ".chezmoidata.yaml" | sha256sum`): its
+    # contents can't be traced to keys, so the template depends on the root key and matches every change
+    FILE_INCLUDE_RE = re.compile(r'\binclude\s+"(?P<path>[^"]+)"')
+
+    # Which data keys each kind of reconcile change edits
+    CHANGE_KEYS = {
+        'brew_formulae': ('platform_packages', 'darwin', 'system'),
+        'brew_casks': ('platform_packages', 'darwin', 'applications'),
+        'cargo_crates': ('cli_tools',),
+        'npm_packages': ('cli_tools',),
+        'mise_versions': ('languages',),
+    }
+
+    def __init__(self, source_dir: Path):
+        self.source_dir = source_dir
+        self.references: Dict[Path, Set[Tuple[str, ...]]] = {}
+
+    @classmethod
+    def parse_references(cls, text: str) -> Set[Tuple[str, ...]]:
+        """Data key paths referenced by one template."""
+        refs = set()
+        for match in cls.REFERENCE_RE.finditer(text):
+            path = [match.group(2)] + [p for p in match.group(3).split('.') if p]
+            if match.group(1):
+                path += re.findall(r'"([^"]+)"', match.group(4))
+            refs.add(tuple(path))
+        for match in cls.FILE_INCLUDE_RE.finditer(text):
+            if not match.group('path').endswith('.tmpl'):
+                refs.add(())
+        return refs
+
+    def build(self) -> 'TemplateDependencyIndex':
+        """Scan all *.tmpl files. Templates that name another template's path (e.g. a script that
+        renders os/macos/Brewfile.tmpl) inherit that template's references."""
+        templates = [
+            p for p in self.source_dir.rglob('*.tmpl')
+            if '.git' not in p.relative_to(self.source_dir).parts
+        ]
+        texts = {p: p.read_text(encoding='utf-8', errors='replace') for p in templates}
+        self.references = {p: self.parse_references(text) for p, text in texts.items()}
+
+        includes = {
+            p: {other for other in templates
+                if other != p and str(other.relative_to(self.source_dir)) in text}
+            for p, text in texts.items()
+        }
+        changed = True
+        while changed:
+            changed = False
+            for p, others in includes.items():
+                for other in others:
+                    if not self.references[other] <= self.references[p]:
+                        self.references[p] |= self.references[other]
+                        changed = True
+        return self
+
+    @staticmethod
+    def overlaps(a: Tuple[str, ...], b: Tuple[str, ...]) -> bool:
+        """Whether one key path contains the other."""
+        shortest = min(len(a), len(b))
+        return a[:shortest] == b[:shortest]
+
+    @classmethod
+    def changed_keys(cls, changes: Dict) -> Set[Tuple[str, ...]]:
+        """Data key paths edited by update_config_file."""
+        return {key for kind, key in cls.CHANGE_KEYS.items() if changes.get(kind)}
+
+    def dependent_sources(self, keys: Set[Tuple[str, ...]]) -> List[Path]:
+        """Templates that read any of the given key paths."""
+        return sorted(
+            p for p, refs in self.references.items()
+            if any(self.overlaps(ref, key) for ref in refs for key in keys)
+        )
+
+    def targets_for(self, keys: Set[Tuple[str, ...]]) -> List[str]:
+        """Managed chezmoi targets (files and scripts) rendered from dependent templates."""
+        sources = self.dependent_sources(keys)
+        if not sources:
+            return []
+
+        result = subprocess.run(
+            ['chezmoi', 'target-path'] + [str(p) for p in sources],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        candidates = [line for line in result.stdout.splitlines() if line]
+
+        # Ignored templates (e.g. os/ via .chezmoiignore) have a target path but are not applied
+        managed = subprocess.run(
+            ['chezmoi', 'managed', '--include=files,scripts', '--path-style=absolute'],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+        managed_set = set(managed.stdout.splitlines())
+        return [t for t in candidates if t in managed_set]
+
+
 class Reconciler:
     """Main reconciliation logic."""
 
-    def __init__(self, debug: bool = False):
+    def __init__(self, debug: bool = False, full_apply: bool = False):
         self.debug = debug
+        self.full_apply = full_apply
         self.detector = PackageDetector()
         self.chezmoi_source = self.get_chezmoi_source()
         self.config_path = self.chezmoi_source / ".chezmoidata.yaml"
@@ -495,6 +606,59 @@ class Reconciler:
 
         return changes
 
+    def offer_apply(self, changes: Dict):
+        """Apply only the targets whose templates read the edited keys (or everything with --full-apply)."""
+        targets: List[str] = []
+        timings: List[Tuple[str, float]] = []
+
+        if not self.full_apply:
+            try:
+                start = time.perf_counter()
+                index = TemplateDependencyIndex(self.chezmoi_source).build()
+                timings.append((f"Index {len(index.references)} templates", time.perf_counter() - start))
+
+                start = time.perf_counter()
+                keys = index.changed_keys(changes)
+                targets = index.targets_for(keys)
+                timings.append(("Resolve targets", time.perf_counter() - start))
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"{Colors.YELLOW}⚠️  Could not build template dependency index ({e}) - "
+                      f"falling back to full apply{Colors.NC}")
+                self.full_apply = True
+
+        if self.full_apply:
+            prompt = "Apply changes with 'chezmoi apply'?"
+            cmd = ['chezmoi', 'apply']
+        elif not targets:
+            print(f"{Colors.BLUE}ℹ️  No managed targets depend on the changed keys - nothing to apply{Colors.NC}")
+            return
+        else:
+            print(f"\n{Colors.BLUE}ℹ️  Targets depending on "
+                  f"{', '.join('.'.join(k) for k in sorted(keys))}:{Colors.NC}")
+            for target in targets:
+                print(f"  • {target}")
+            prompt = f"Apply these {len(targets)} targets with 'chezmoi apply'?"
+            cmd = ['chezmoi', 'apply'] + targets
+
+        response = input(f"{Colors.YELLOW}❓ {prompt} (y/N): {Colors.NC}").strip().lower()
+        if response != 'y':
+            print(f"{Colors.BLUE}ℹ️  Skipping chezmoi apply - run manually when ready{Colors.NC}")
+            return
+
+        print(f"\n{Colors.BLUE}ℹ️  Running '{' '.join(cmd[:2])}'...{Colors.NC}")
+        start = time.perf_counter()
+        result = subprocess.run(cmd, capture_output=False)
+        timings.append(("chezmoi apply", time.perf_counter() - start))
+
+        if result.returncode == 0:
+            print(f"{Colors.GREEN}✅ Dotfiles applied successfully{Colors.NC}")
+        else:
+            print(f"{Colors.YELLOW}⚠️  chezmoi apply returned non-zero exit code{Colors.NC}")
+
+        print(f"\n{Colors.CYAN}═══ Timing ═══{Colors.NC}")
+        for label, seconds in timings:
+            print(f"  {label:<28} {seconds:6.2f}s")
+
     def run(self):
         """Main reconciliation workflow."""
         print(f"{Colors.MAGENTA}")
@@ -625,19 +789,7 @@ class Reconciler:
 
                 print(f"{Colors.GREEN}✅ Changes committed{Colors.NC}")
 
-                # Ask about applying with chezmoi
-                response = input(f"{Colors.YELLOW}❓ Apply changes with 'chezmoi apply'? (y/N): {Colors.NC}").strip().lower()
-
-                if response == 'y':
-                    print(f"\n{Colors.BLUE}ℹ️  Running 'chezmoi apply'...{Colors.NC}")
-                    result = subprocess.run(['chezmoi', 'apply'], capture_output=False)
-
-                    if result.returncode == 0:
-                        print(f"{Colors.GREEN}✅ Dotfiles applied successfully{Colors.NC}")
-                    else:
-                        print(f"{Colors.YELLOW}⚠️  chezmoi apply returned non-zero exit code{Colors.NC}")
-                else:
-                    print(f"{Colors.BLUE}ℹ️  Skipping chezmoi apply - run manually when ready{Colors.NC}")
+                self.offer_apply(changes)
             else:
                 print(f"{Colors.BLUE}ℹ️  Changes saved but not committed{Colors.NC}")
                 print(f"{Colors.BLUE}ℹ️  Run 'git add .chezmoidata.yaml && git commit' to commit manually{Colors.NC}")
@@ -659,10 +811,16 @@ def main():
         help='Debug mode - show detected packages without making changes'
     )
 
+    parser.add_argument(
+        '--full-apply',
+        action='store_true',
+        help="Offer a full 'chezmoi apply' instead of applying only targets that depend on the changes"
+    )
+
     args = parser.parse_args()
 
     try:
-        reconciler = Reconciler(debug=args.debug)
+        reconciler = Reconciler(debug=args.debug, full_apply=args.full_apply)
         reconciler.run()
     except KeyboardInterrupt:
         print(f"\n{Colors.YELLOW}⚠️  Interrupted by user{Colors.NC}")
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Zsh bundle builder - Concatenate the layered zsh modules into one zcompiled file.
+
+.zshrc sources dozens of small files, paying a stat+open+parse for each. This
+script joins them in the same dependency order as .zshrc, strips comment lines,
+rejects modules that would misbehave when concatenated (a second `compinit`, a
+top-level `return`) and zcompiles the result. .zshrc sources the bundle while it
+is newer than every module and falls back to modular loading otherwise.
+"""
+
+import argparse
+import math
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+class Colors:
+    """ANSI color codes for terminal output."""
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    CYAN = '\033[0;36m'
+    MAGENTA = '\033[0;35m'
+    NC = '\033[0m'  # No Color
+
+
+XDG_CONFIG_HOME = Path(os.environ.get('XDG_CONFIG_HOME', Path.home() / '.config'))
+XDG_CACHE_HOME = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache'))
+
+DEFAULT_ZDOTDIR = Path(os.environ.get('ZDOTDIR', XDG_CONFIG_HOME / 'zsh'))
+DEFAULT_BUNDLE = XDG_CACHE_HOME / 'zsh' / 'bundle.zsh'
+
+# Load order - keep in sync with the modular loops in dot_config/zsh/dot_zshrc
+LAYERS = [
+    ('Foundation', ['0[1-3]-*.zsh']),
+    ('Initialization', ['1[0-3]-*.zsh']),
+    ('Tools', ['20-tools/*.zsh']),
+    ('Interface', ['3[0-9]-*.zsh', '30-functions/*.zsh', '9[0-9]-*.zsh']),
+]
+
+# Emitted before the first module of a layer (mirrors dot_zshrc)
+LAYER_PRELUDE = {
+    'Tools': ['[[ -r "${XDG_CACHE_HOME:-$HOME/.cache}/zsh/tool-init/init.zsh" ]] && '
+              'source "${XDG_CACHE_HOME:-$HOME/.cache}/zsh/tool-init/init.zsh"'],
+}
+
+HEREDOC_RE = re.compile(r'<<-?\s*([\'"]?)([A-Za-z_][A-Za-z0-9_]*)\1')
+# A command in command position: line start, after a separator/brace, or after then/else/do
+COMMAND_POSITION = r'(?:^\s*|[;&|{(]\s*|\b(?:then|else|do)\s+)'
+COMPINIT_RE = re.compile(COMMAND_POSITION + r'(compinit)\b')
+RETURN_RE = re.compile(COMMAND_POSITION + r'(return)(?:\s|;|$)')
+
+
+class BundleError(Exception):
+    """A module cannot be bundled safely."""
+
+
+class ShellLine:
+    """One source line with the lexer state needed to process it."""
+
+    def __init__(self, text: str, lineno: int, in_literal: bool, depth: int, code: str):
+        self.text = text
+        self.lineno = lineno
+        self.in_literal = in_literal  # starts inside a multi-line string or heredoc
+        self.depth = depth            # unquoted brace depth at the start of the line
+        self.code = code              # unquoted, uncommented part of the line
+
+    @property
+    def is_comment(self) -> bool:
+        return not self.in_literal and self.text.lstrip().startswith('#')
+
+    @property
+    def is_blank(self) -> bool:
+        return not self.in_literal and not self.text.strip()
+
+
+def scan(text: str) -> List[ShellLine]:
+    """Minimal zsh lexer: tracks quotes, heredocs, comments and brace depth across lines."""
+    lines = []
+    quote: Optional[str] = None
+    heredocs: List[str] = []
+    in_heredoc: Optional[str] = None
+    depth = 0
+
+    for lineno, line in enumerate(text.splitlines(), 1):
+        in_literal = quote is not None or in_heredoc is not None
+        start_depth = depth
+
+        if in_heredoc is not None:
+            if line.lstrip('\t') == in_heredoc:
+                in_heredoc = heredocs.pop(0) if heredocs else None
+            lines.append(ShellLine(line, lineno, in_literal, start_depth, ''))
+            continue
+
+        code = []
+        i = 0
+        while i < len(line):
+            ch = line[i]
+            if quote == "'":
+                if ch == "'":
+                    quote = None
+            elif quote in ('"', "$'"):
+                if ch == '\\':
+                    i += 1
+                elif (ch == '"' and quote == '"') or (ch == "'" and quote == "$'"):
+                    quote = None
+            elif ch == '\\':
+                i += 1
+            elif ch == "'":
+                quote = "$'" if code and code[-1] == '$' else "'"
+            elif ch == '"':
+                quote = '"'
+            elif ch == '#' and (i == 0 or line[i - 1] in ' \t;'):
+                break
+            else:
+                if ch == '{':
+                    depth += 1
+                elif ch == '}':
+                    depth -= 1
+                elif ch == '<' and line.startswith('<<', i) and not line.startswith('<<<', i):
+                    match = HEREDOC_RE.match(line, i)
+                    if match:
+                        heredocs.append(match.group(2))
+                code.append(ch)
+            i += 1
+
+        if heredocs and in_heredoc is None:
+            in_heredoc = heredocs.pop(0)
+        lines.append(ShellLine(line, lineno, in_literal, start_depth, ''.join(code)))
+
+    return lines
+
+
+class BundleBuilder:
+    """Collect, validate and write the bundle."""
+
+    def __init__(self, zdotdir: Path, output: Path):
+        self.zdotdir = zdotdir
+        self.output = output
+
+    def modules(self) -> List[Tuple[str, List[Path]]]:
+        """Module files per layer, in load order."""
+        layers = []
+        for name, patterns in LAYERS:
+            files = []
+            for pattern in patterns:
+                files.extend(sorted(p for p in self.zdotdir.glob(pattern) if p.is_file()))
+            layers.append((name, files))
+        return layers
+
+    def check_module(self, path: Path, lines: List[ShellLine], compinit_calls: List[str]) -> None:
+        """Reject constructs that change meaning once modules share a single file."""
+        for line in lines:
+            if line.in_literal:
+                continue
+            rel = f"{path.relative_to(self.zdotdir)}:{line.lineno}"
+            compinit_calls.extend(rel for _ in COMPINIT_RE.finditer(line.code))
+            match = RETURN_RE.search(line.code)
+            if match and line.depth + line.code[:match.start(1)].count('{') - line.code[:match.start(1)].count('}') <= 0:
+                raise BundleError(f"top-level 'return' at {rel} would stop the whole bundle")
+
+    def render(self) -> Tuple[str, int]:
+        """Build bundle text. Returns (text, number of modules)."""
+        out = [
+            f'# Generated by bin/zsh-bundle.py from {self.zdotdir} on {datetime.now().isoformat(timespec="seconds")}',
+            '# Do not edit - .zshrc falls back to the modules when they are newer than this file',
+        ]
+        compinit_calls: List[str] = []
+        count = 0
+
+        for layer, files in self.modules():
+            out.append(f'# === {layer} layer')
+            out.extend(LAYER_PRELUDE.get(layer, []))
+            for path in files:
+                lines = scan(path.read_text())
+                self.check_module(path, lines, compinit_calls)
+                out.append(f'# --- {path.relative_to(self.zdotdir)}')
+                out.extend(line.text for line in lines if not line.is_comment and not line.is_blank)
+                count += 1
+
+        if len(compinit_calls) > 1:
+            raise BundleError(f"compinit is called {len(compinit_calls)} times: {', '.join(compinit_calls)}")
+
+        return '\n'.join(out) + '\n', count
+
+    @staticmethod
+    def zsh() -> Optional[str]:
+        return shutil.which('zsh')
+
+    def build(self) -> int:
+        """Write, syntax-check and zcompile the bundle. Returns number of modules bundled."""
+        text, count = self.render()
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=self.output.parent, prefix=f'.{self.output.name}.')
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+
+        zsh = self.zsh()
+        if zsh:
+            result = subprocess.run([zsh, '-n', tmp], capture_output=True, text=True, check=False)
+            if result.returncode != 0:
+                os.unlink(tmp)
+                raise BundleError(f"bundle failed 'zsh -n': {result.stderr.strip()}")
+
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, self.output)
+
+        if zsh:
+            subprocess.run([zsh, '-fc', 'zcompile -- "$1"', 'zcompile', str(self.output)],
+                           capture_output=True, check=True)
+        return count
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(pct / 100 * len(ordered))) - 1] if ordered else 0.0
+
+
+def time_startup(zsh: str, env: Dict[str, str], runs: int) -> List[float]:
+    """Wall-clock milliseconds of `zsh -i -c exit`, one sample per run."""
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([zsh, '-i', '-c', 'exit'], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, env=env, check=False)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def benchmark(runs: int, warmup: int) -> None:
+    """Compare interactive startup time with and without the bundle."""
+    zsh = BundleBuilder.zsh()
+    if not zsh:
+        raise BundleError('zsh not found - cannot benchmark')
+
+    modular_env = dict(os.environ, ZSH_NO_BUNDLE='1')
+    bundled_env = {k: v for k, v in os.environ.items() if k != 'ZSH_NO_BUNDLE'}
+
+    print(f"\n{Colors.CYAN}═══ Startup benchmark ({runs} runs, {warmup} warmup) ═══{Colors.NC}\n")
+    results = {}
+    for label, env in (('modular', modular_env), ('bundled', bundled_env)):
+        time_startup(zsh, env, warmup)
+        samples = time_startup(zsh, env, runs)
+        results[label] = statistics.fmean(samples)
+        print(f"  {label:<8} mean {results[label]:7.1f} ms   p95 {percentile(samples, 95):7.1f} ms"
+              f"   min {min(samples):7.1f} ms")
+
+    saved = results['modular'] - results['bundled']
+    color = Colors.GREEN if saved > 0 else Colors.YELLOW
+    print(f"\n  {color}Bundle saves {saved:.1f} ms per shell ({saved / results['modular']:.0%}){Colors.NC}")
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Bundle the layered zsh configuration into one zcompiled file'
+    )
+    parser.add_argument('--zdotdir', type=Path, default=DEFAULT_ZDOTDIR,
+                        help=f'Directory holding the zsh modules (default: {DEFAULT_ZDOTDIR})')
+    parser.add_argument('-o', '--output', type=Path, default=DEFAULT_BUNDLE,
+                        help=f'Bundle file (default: {DEFAULT_BUNDLE})')
+    parser.add_argument('--bench', action='store_true',
+                        help='After building, compare startup time with and without the bundle')
+    parser.add_argument('-n', '--runs', type=int, default=20, help='Benchmark runs per mode (default: 20)')
+    parser.add_argument('--warmup', type=int, default=2, help='Benchmark warmup runs per mode (default: 2)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Only print errors')
+
+    args = parser.parse_args()
+
+    if not args.zdotdir.is_dir():
+        print(f"{Colors.RED}❌ zsh config directory not found: {args.zdotdir}{Colors.NC}")
+        sys.exit(1)
+
+    try:
+        count = BundleBuilder(args.zdotdir, args.output).build()
+        if not args.quiet:
+            print(f"{Colors.GREEN}✅ Bundled {count} modules into {args.output}{Colors.NC}")
+        if args.bench:
+            benchmark(args.runs, args.warmup)
+    except BundleError as e:
+        print(f"{Colors.RED}❌ {e}{Colors.NC}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Zsh tool init cache - Run each tool's shell init command once and cache the output.
+
+`20-tools/*.zsh` used to fork `brew shellenv`, `mise activate`, `pyenv init`,
+`zoxide init`, `fzf --zsh`, `oh-my-posh init` and `thefuck --alias` on every new
+shell. This script stores their output in one zcompiled file that .zshrc sources
+instead. Entries are keyed on the tool binary's path, mtime and version, and the
+generated file falls back to live init (regenerating in the background) when a
+tool binary changes.
+"""
+
+import argparse
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class Colors:
+    """ANSI color codes for terminal output."""
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    CYAN = '\033[0;36m'
+    MAGENTA = '\033[0;35m'
+    NC = '\033[0m'  # No Color
+
+
+XDG_CACHE_HOME = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache'))
+XDG_DATA_HOME = Path(os.environ.get('XDG_DATA_HOME', Path.home() / '.local' / 'share'))
+
+DEFAULT_CACHE_DIR = XDG_CACHE_HOME / 'zsh' / 'tool-init'
+
+OH_MY_POSH_THEME = XDG_DATA_HOME / 'oh-my-posh' / 'themes' / 'adamnewell.toml'
+
+
+def oh_my_posh_command() -> List[str]:
+    """oh-my-posh init, using the custom theme when it is installed (mirrors 20-tools/misc.zsh)."""
+    if OH_MY_POSH_THEME.is_file():
+        return ['oh-my-posh', 'init', 'zsh', '--config', str(OH_MY_POSH_THEME)]
+    return ['oh-my-posh', 'init', 'zsh']
+
+
+# Cached tools in the order their snippets are sourced. Each entry maps to a
+# `_zsh_tool_init[<name>]` guard in the 20-tools modules.
+# name: (init command, version command)
+TOOLS = {
+    'brew': (['brew', 'shellenv'], ['brew', '--version']),
+    'mise': (['mise', 'activate', 'zsh'], ['mise', '--version']),
+    'pyenv': (['pyenv', 'init', '-', 'zsh'], ['pyenv', '--version']),
+    'pyenv-virtualenv': (['pyenv', 'virtualenv-init', '-'], ['pyenv', '--version']),
+    'zoxide': (['zoxide', 'init', 'zsh'], ['zoxide', '--version']),
+    'fzf': (['fzf', '--zsh'], ['fzf', '--version']),
+    'oh-my-posh': (oh_my_posh_command(), ['oh-my-posh', '--version']),
+    'thefuck': (['thefuck', '--alias'], ['thefuck', '--version']),
+}
+
+
+class ToolInitCache:
+    """Generate and validate the cached init file."""
+
+    def __init__(self, cache_dir: Path, quiet: bool = False):
+        self.cache_dir = cache_dir
+        self.quiet = quiet
+        self.init_file = cache_dir / 'init.zsh'
+        self.manifest_file = cache_dir / 'manifest.json'
+
+    def log(self, message: str) -> None:
+        if not self.quiet:
+            print(message)
+
+    @staticmethod
+    def run_command(cmd: List[str]) -> Optional[str]:
+        """Run a command and return its stdout, or None if it failed."""
+        try:
+            result = subprocess.run(
+                cmd,
+                capture_output=True,
+                text=True,
+                stdin=subprocess.DEVNULL,
+                timeout=60,
+                check=False
+            )
+        except (OSError, subprocess.TimeoutExpired):
+            return None
+        if result.returncode != 0:
+            return None
+        return result.stdout
+
+    @staticmethod
+    def binary_key(binary: str) -> Dict:
+        """Path and mtime of a tool binary (symlinks resolved so version-directory upgrades are seen)."""
+        resolved = Path(binary).resolve()
+        return {
+            'path': binary,
+            'realpath': str(resolved),
+            'mtime': resolved.stat().st_mtime,
+        }
+
+    def tool_version(self, cmd: List[str]) -> str:
+        """First line of `<tool> --version` (some tools print it to stderr)."""
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, stdin=subprocess.DEVNULL,
+                                    timeout=30, check=False)
+        except (OSError, subprocess.TimeoutExpired):
+            return ''
+        output = (result.stdout or result.stderr).strip()
+        return output.splitlines()[0] if output else ''
+
+    def load_manifest(self) -> Dict:
+        try:
+            return json.loads(self.manifest_file.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def current_keys(self) -> Dict[str, Dict]:
+        """Cache key of every installed tool. Tools not on PATH are left out."""
+        keys = {}
+        for name, (init_cmd, version_cmd) in TOOLS.items():
+            binary = shutil.which(init_cmd[0])
+            if not binary:
+                continue
+            key = self.binary_key(binary)
+            key['command'] = init_cmd
+            key['version'] = self.tool_version(version_cmd)
+            keys[name] = key
+        return keys
+
+    def is_stale(self, keys: Dict[str, Dict]) -> bool:
+        """Whether the cached file is missing or was generated for different binaries."""
+        if not self.init_file.exists():
+            return True
+        cached = {name: entry.get('key') for name, entry in self.load_manifest().get('tools', {}).items()}
+        return cached != keys
+
+    def render(self, keys: Dict[str, Dict], snippets: Dict[str, Optional[str]]) -> str:
+        """Build init.zsh: freshness guard followed by one snippet per tool."""
+        init_path = shlex.quote(str(self.init_file))
+        regenerate = ' '.join(shlex.quote(part) for part in [sys.executable, str(Path(__file__).resolve()), '--quiet'])
+
+        checks = []
+        for key in keys.values():
+            binary = shlex.quote(key['path'])
+            realpath = shlex.quote(key['realpath'])
+            checks.append(f"[[ ! -e {binary} || ${{${{:-{binary}}}:A}} != {realpath} || {binary} -nt {init_path} ]]")
+
+        lines = [
+            '# Generated by bin/zsh-init-cache.py - do not edit, changes are overwritten',
+            '# Each snippet sets _zsh_tool_init[<tool>] so 20-tools modules skip their live `eval`',
+            'typeset -gA _zsh_tool_init',
+            '',
+        ]
+        if checks:
+            lines += [
+                '# A tool was upgraded or removed: regenerate in the background and let the',
+                '# modules fall back to live init for this shell',
+                'if ' + ' ||\n   '.join(checks) + '; then',
+                f'    {{ {regenerate} >/dev/null 2>&1 }} &!',
+                '    return 1',
+                'fi',
+                '',
+            ]
+
+        for name, snippet in snippets.items():
+            lines.append(f"# --- {name}: {' '.join(keys[name]['command'])} ({keys[name]['version'] or 'unknown version'})")
+            if snippet is None:
+                # Mark failed commands as handled so every shell doesn't retry a failing fork
+                lines.append('# init command failed during generation; skipped')
+            else:
+                lines.append(snippet.rstrip('\n'))
+            lines.append(f"_zsh_tool_init[{name}]=1")
+            lines.append('')
+
+        return '\n'.join(lines)
+
+    def write_atomic(self, path: Path, content: str) -> None:
+        """Replace a file atomically so concurrent shells never source a partial file."""
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+        with os.fdopen(fd, 'w') as f:
+            f.write(content)
+        os.replace(tmp, path)
+
+    def zcompile(self) -> bool:
+        """Compile init.zsh to wordcode so sourcing skips parsing."""
+        zsh = shutil.which('zsh')
+        if not zsh:
+            return False
+        result = subprocess.run([zsh, '-fc', 'zcompile -- "$1"', 'zcompile', str(self.init_file)],
+                                capture_output=True, check=False)
+        return result.returncode == 0
+
+    def generate(self, force: bool = False) -> bool:
+        """Regenerate the cache if needed. Returns True if the file was rewritten."""
+        keys = self.current_keys()
+
+        if not force and not self.is_stale(keys):
+            self.log(f"{Colors.GREEN}✅ Tool init cache is up to date ({len(keys)} tools){Colors.NC}")
+            return False
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        snippets: Dict[str, Optional[str]] = {}
+        manifest = {'tools': {}}
+
+        for name, key in keys.items():
+            output = self.run_command(key['command'])
+            snippets[name] = output if output and output.strip() else None
+            manifest['tools'][name] = {'key': key, 'ok': snippets[name] is not None}
+
+            if snippets[name] is None:
+                self.log(f"{Colors.YELLOW}⚠️  {name}: '{' '.join(key['command'])}' failed - skipped{Colors.NC}")
+            else:
+                self.log(f"  • {name} ({key['version'] or 'unknown version'})")
+
+        for name, (init_cmd, _) in TOOLS.items():
+            if name not in keys:
+                self.log(f"{Colors.BLUE}ℹ️  {name}: {init_cmd[0]} not found on PATH{Colors.NC}")
+
+        self.write_atomic(self.init_file, self.render(keys, snippets))
+        self.write_atomic(self.manifest_file, json.dumps(manifest, indent=2) + '\n')
+
+        if self.zcompile():
+            self.log(f"{Colors.GREEN}✅ Wrote and compiled {self.init_file}{Colors.NC}")
+        else:
+            self.log(f"{Colors.GREEN}✅ Wrote {self.init_file}{Colors.NC} (zsh not found - not compiled)")
+        return True
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Cache shell init snippets of zsh tools (brew, mise, pyenv, zoxide, fzf, ...)'
+    )
+    parser.add_argument('-f', '--force', action='store_true', help='Regenerate even if the cache is up to date')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Only print errors')
+    parser.add_argument('--cache-dir', type=Path, default=DEFAULT_CACHE_DIR,
+                        help=f'Cache directory (default: {DEFAULT_CACHE_DIR})')
+
+    args = parser.parse_args()
+
+    try:
+        ToolInitCache(args.cache_dir, quiet=args.quiet).generate(force=args.force)
+    except OSError as e:
+        print(f"{Colors.RED}❌ Error: {e}{Colors.NC}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Zsh startup profiler - Attribute interactive shell startup time to the files
+and commands that cause it.
+
+Launches `zsh -i` repeatedly with a timestamped xtrace prompt, parses the trace
+and reports mean/p95 time per sourced file and per command. Baselines can
+be saved and compared so startup regressions are caught locally.
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+
+class Colors:
+    """ANSI color codes for terminal output."""
+    RED = '\033[0;31m'
+    GREEN = '\033[0;32m'
+    YELLOW = '\033[1;33m'
+    BLUE = '\033[0;34m'
+    CYAN = '\033[0;36m'
+    MAGENTA = '\033[0;35m'
+    NC = '\033[0m'  # No Color
+
+
+# Every trace line starts with this marker so it can be told apart from
+# regular stderr output (warnings printed by plugins, etc.)
+TRACE_MARKER = '+ZSHPROF'
+
+# %D{%s.%6.} = epoch seconds with microseconds, %x = file being executed
+# (function bodies report the file defining them, see TraceRun.parse), %I = line in that file
+TRACE_PS4 = TRACE_MARKER + '|%D{%s.%6.}|%x|%I> '
+TRACE_RE = re.compile(r'^' + re.escape(TRACE_MARKER) + r'\|(\d+\.\d+)\|(.*)\|(\d+)> (.*)$')
+
+# Command passed to `zsh -i -c`; runs after all startup files have been sourced
+END_COMMAND = 'unsetopt xtrace'
+
+DEFAULT_BASELINE = Path(
+    os.environ.get('XDG_STATE_HOME', Path.home() / '.local' / 'state')
+) / 'zsh' / 'startup-baseline.json'
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    """Mean and p95 of a list of millisecond values."""
+    return {
+        'mean': statistics.fmean(values) if values else 0.0,
+        'p95': percentile(values, 95),
+    }
+
+
+def is_startup_file(source: str, roots: Tuple[str, ...]) -> bool:
+    """Whether a traced file is one of the user's startup files (or lives in a startup directory)."""
+    return any(source == root or source.startswith(root.rstrip('/') + '/') for root in roots)
+
+
+class TraceRun:
+    """Timings extracted from one traced zsh startup."""
+
+    def __init__(self, wall_ms: float):
+        self.wall_ms = wall_ms
+        self.traced_ms = 0.0
+        self.files: Dict[str, float] = {}
+        self.commands: Dict[Tuple[str, int], float] = {}
+        self.command_text: Dict[Tuple[str, int], str] = {}
+
+    @classmethod
+    def parse(cls, trace: str, wall_ms: float, startup_roots: Tuple[str, ...] = ()) -> 'TraceRun':
+        r"""Parse xtrace output, charging the gap to the next trace line to each command.
+
+        xtrace follows calls into function bodies, whose %x is the file defining the
+        function (an fpath file for compinit). Lines from files outside startup_roots
+        are charged to the last startup-file line before them, so the calling module
+        and line get inclusive time. With no roots every file counts as a startup file.
+
+        >>> trace = '\n'.join([
+        ...     '+ZSHPROF|100.000000|/z/.zshrc|1> source /z/10-completions.zsh',
+        ...     '+ZSHPROF|100.001000|/z/10-completions.zsh|3> compinit -C',
+        ...     '+ZSHPROF|100.002000|/usr/share/zsh/functions/compinit|5> emulate -L zsh',
+        ...     '+ZSHPROF|100.030000|/usr/share/zsh/functions/compinit|90> compdump',
+        ...     '+ZSHPROF|100.040000|/z/10-completions.zsh|4> zstyle :completion:* menu select',
+        ...     '+ZSHPROF|100.041000|zsh|1> unsetopt xtrace',
+        ... ])
+        >>> run = TraceRun.parse(trace, 50.0, startup_roots=('/z',))
+        >>> round(run.commands[('/z/10-completions.zsh', 3)], 3)
+        39.0
+        >>> round(run.files['/z/10-completions.zsh'], 3)
+        40.0
+        >>> sorted(run.files)
+        ['/z/.zshrc', '/z/10-completions.zsh']
+        """
+        run = cls(wall_ms)
+        entries = []
+        for line in trace.splitlines():
+            match = TRACE_RE.match(line)
+            # Lines without the marker are multi-line command continuations
+            # or regular stderr output; neither carries timing information
+            if match:
+                ts, source, lineno, command = match.groups()
+                entries.append((float(ts), source, int(lineno), command.strip()))
+
+        if len(entries) < 2:
+            return run
+
+        run.traced_ms = (entries[-1][0] - entries[0][0]) * 1000
+        caller = None
+        for current, following in zip(entries, entries[1:]):
+            ts, source, lineno, command = current
+            elapsed = (following[0] - ts) * 1000
+            if not startup_roots or is_startup_file(source, startup_roots) or caller is None:
+                caller = (source, lineno, command)
+            source, lineno, command = caller
+            key = (source, lineno)
+            run.files[source] = run.files.get(source, 0.0) + elapsed
+            run.commands[key] = run.commands.get(key, 0.0) + elapsed
+            run.command_text.setdefault(key, command)
+
+        return run
+
+
+class StartupProfiler:
+    """Run traced zsh startups and aggregate their timings."""
+
+    def __init__(self, zsh: str, login: bool = False, zprof: bool = False):
+        self.zsh = zsh
+        self.login = login
+        self.zprof = zprof
+        self.zprof_output = ''
+        self.startup_roots: Tuple[str, ...] = ()
+
+    @staticmethod
+    def default_startup_roots() -> Tuple[str, ...]:
+        """Files and directories whose lines are reported as startup code; everything
+        else (fpath functions, plugin files) is charged to the startup line calling it."""
+        home = Path.home()
+        config = Path(os.environ.get('XDG_CONFIG_HOME', home / '.config'))
+        cache = Path(os.environ.get('XDG_CACHE_HOME', home / '.cache'))
+        roots = [config / 'zsh', cache / 'zsh']
+        roots += [home / name for name in ('.zshenv', '.zprofile', '.zshrc', '.zlogin')]
+        if os.environ.get('ZDOTDIR'):
+            roots.append(Path(os.environ['ZDOTDIR']))
+        return tuple(str(root) for root in roots)
+
+    def write_wrapper(self, wrapper_dir: Path) -> None:
+        """Create a ZDOTDIR whose .zshenv enables tracing and hands over to the real startup files."""
+        lines = [
+            '# Generated by zsh-startup-profile.py',
+            f"typeset -g PS4='{TRACE_PS4}'",
+        ]
+        if self.zprof:
+            lines.append('zmodload zsh/zprof')
+        lines += [
+            # Restore the caller's ZDOTDIR so .zprofile/.zshrc are read from the real location
+            'if [[ -n ${ZSHPROF_ZDOTDIR-} ]]; then ZDOTDIR=$ZSHPROF_ZDOTDIR; else unset ZDOTDIR; fi',
+            'unset ZSHPROF_ZDOTDIR',
+            'setopt xtrace',
+            '[[ -r ${ZDOTDIR:-$HOME}/.zshenv ]] && source ${ZDOTDIR:-$HOME}/.zshenv',
+        ]
+        (wrapper_dir / '.zshenv').write_text('\n'.join(lines) + '\n')
+
+    def run_once(self, wrapper_dir: Path, want_zprof: bool = False) -> TraceRun:
+        """Start one interactive shell and parse its trace."""
+        env = os.environ.copy()
+        env.pop('ZSHPROF_ZDOTDIR', None)
+        if 'ZDOTDIR' in env:
+            env['ZSHPROF_ZDOTDIR'] = env['ZDOTDIR']
+        env['ZDOTDIR'] = str(wrapper_dir)
+
+        command = END_COMMAND + ('; zprof' if want_zprof else '')
+        cmd = [self.zsh, '-i'] + (['-l'] if self.login else []) + ['-c', command]
+
+        start = time.perf_counter()
+        result = subprocess.run(
+            cmd,
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
+            errors='replace',
+            env=env,
+            check=False
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+
+        if want_zprof:
+            self.zprof_output = result.stdout
+        return TraceRun.parse(result.stderr, wall_ms, self.startup_roots)
+
+    def profile(self, runs: int, warmup: int) -> List[TraceRun]:
+        """Warm caches, then collect `runs` traced startups."""
+        results = []
+        with tempfile.TemporaryDirectory(prefix='zsh-startup-profile.') as tmp:
+            wrapper_dir = Path(tmp)
+            self.write_wrapper(wrapper_dir)
+            self.startup_roots = self.default_startup_roots() + (str(wrapper_dir),)
+
+            for _ in range(warmup):
+                self.run_once(wrapper_dir)
+
+            for i in range(runs):
+                last = i == runs - 1
+                results.append(self.run_once(wrapper_dir, want_zprof=self.zprof and last))
+                print(f"\r{Colors.BLUE}ℹ️  Run {i + 1}/{runs}{Colors.NC}", end='', file=sys.stderr, flush=True)
+        print(file=sys.stderr)
+        return results
+
+
+class Report:
+    """Aggregate statistics over several traced runs."""
+
+    def __init__(self, runs: List[TraceRun]):
+        self.runs = runs
+        self.wall = summarize([r.wall_ms for r in runs])
+        self.traced = summarize([r.traced_ms for r in runs])
+
+        self.files: Dict[str, Dict[str, float]] = {}
+        for source in {f for r in runs for f in r.files}:
+            self.files[source] = summarize([r.files.get(source, 0.0) for r in runs])
+
+        self.command_text: Dict[Tuple[str, int], str] = {}
+        for r in runs:
+            for key, text in r.command_text.items():
+                self.command_text.setdefault(key, text)
+
+        self.commands: Dict[Tuple[str, int], Dict[str, float]] = {}
+        for key in self.command_text:
+            self.commands[key] = summarize([r.commands.get(key, 0.0) for r in runs])
+
+    def duplicates(self) -> List[Tuple[str, List[Tuple[str, int]]]]:
+        """Identical commands executed from more than one file (e.g. two `compinit` calls),
+        regardless of cost, most expensive (inclusive time) first."""
+        by_text: Dict[str, List[Tuple[str, int]]] = {}
+        for key, text in self.command_text.items():
+            by_text.setdefault(text, []).append(key)
+
+        dupes = [(text, sorted(keys)) for text, keys in by_text.items()
+                 if len({source for source, _ in keys}) >= 2]
+        return sorted(dupes, key=lambda d: sum(self.commands[key]['mean'] for key in d[1]), reverse=True)
+
+    def to_baseline(self) -> Dict:
+        """Serializable snapshot used for regression checks."""
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'runs': len(self.runs),
+            'wall': self.wall,
+            'traced': self.traced,
+            'files': self.files,
+        }
+
+
+def short_path(path: str) -> str:
+    """Abbreviate $HOME to ~ for display."""
+    home = str(Path.home())
+    return '~' + path[len(home):] if path.startswith(home + '/') else path
+
+
+def truncate(text: str, width: int) -> str:
+    return text if len(text) <= width else text[:width - 1] + '…'
+
+
+def print_report(report: Report, top: int) -> None:
+    """Print per-file and per-command tables."""
+    print(f"\n{Colors.CYAN}═══ Startup time ({len(report.runs)} runs) ═══{Colors.NC}\n")
+    print(f"  Wall clock:  mean {report.wall['mean']:8.1f} ms   p95 {report.wall['p95']:8.1f} ms")
+    print(f"  Traced:      mean {report.traced['mean']:8.1f} ms   p95 {report.traced['p95']:8.1f} ms")
+    print(f"  {Colors.BLUE}(tracing adds overhead; compare traced numbers against traced baselines){Colors.NC}")
+
+    print(f"\n{Colors.CYAN}═══ Slowest files (including functions they call) ═══{Colors.NC}\n")
+    print(f"  {'mean ms':>9} {'p95 ms':>9}  file")
+    ranked_files = sorted(report.files.items(), key=lambda kv: kv[1]['mean'], reverse=True)
+    for source, stats in ranked_files[:top]:
+        print(f"  {stats['mean']:9.2f} {stats['p95']:9.2f}  {short_path(source)}")
+
+    print(f"\n{Colors.CYAN}═══ Slowest commands ═══{Colors.NC}\n")
+    print(f"  {'mean ms':>9} {'p95 ms':>9}  location / command")
+    ranked_cmds = sorted(report.commands.items(), key=lambda kv: kv[1]['mean'], reverse=True)
+    for (source, lineno), stats in ranked_cmds[:top]:
+        location = f"{short_path(source)}:{lineno}"
+        command = truncate(report.command_text[(source, lineno)], 70)
+        print(f"  {stats['mean']:9.2f} {stats['p95']:9.2f}  {location}\n{'':22}{command}")
+
+    dupes = report.duplicates()
+    if dupes:
+        print(f"\n{Colors.YELLOW}⚠️  Commands executed from more than one file:{Colors.NC}\n")
+        for text, keys in dupes[:top]:
+            print(f"  {truncate(text, 70)}")
+            for source, lineno in keys:
+                print(f"      {short_path(source)}:{lineno}  ({report.commands[(source, lineno)]['mean']:.2f} ms)")
+
+
+def compare_baseline(report: Report, baseline: Dict, threshold: float, min_ms: float) -> bool:
+    """Print deltas against a saved baseline. Returns True if a regression was found."""
+    print(f"\n{Colors.CYAN}═══ Comparison with baseline ({baseline.get('created', 'unknown')}) ═══{Colors.NC}\n")
+
+    def regressed(current: float, previous: float) -> bool:
+        return current - previous >= min_ms and current > previous * (1 + threshold)
+
+    regressions = []
+    for label in ('wall', 'traced'):
+        current = getattr(report, label)['mean']
+        previous = baseline.get(label, {}).get('mean', 0.0)
+        marker = f"{Colors.RED}▲{Colors.NC}" if regressed(current, previous) else ' '
+        print(f"  {marker} {label:<7} {previous:8.1f} ms → {current:8.1f} ms ({current - previous:+.1f} ms)")
+        if regressed(current, previous):
+            regressions.append(label)
+
+    old_files = baseline.get('files', {})
+    for source, stats in sorted(report.files.items(), key=lambda kv: kv[1]['mean'], reverse=True):
+        previous = old_files.get(source, {}).get('mean', 0.0)
+        if regressed(stats['mean'], previous):
+            regressions.append(source)
+            print(f"  {Colors.RED}▲{Colors.NC} {short_path(source)}: "
+                  f"{previous:.1f} ms → {stats['mean']:.1f} ms ({stats['mean'] - previous:+.1f} ms)")
+
+    if regressions:
+        print(f"\n{Colors.RED}❌ Startup regression detected (> {threshold:.0%} and ≥ {min_ms:g} ms){Colors.NC}")
+        return True
+
+    print(f"\n{Colors.GREEN}✅ No startup regression against baseline{Colors.NC}")
+    return False
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description='Profile interactive zsh startup per sourced file and command'
+    )
+    parser.add_argument('-n', '--runs', type=int, default=10, help='Number of measured runs (default: 10)')
+    parser.add_argument('-w', '--warmup', type=int, default=1, help='Unmeasured warmup runs (default: 1)')
+    parser.add_argument('-t', '--top', type=int, default=15, help='Rows to show per table (default: 15)')
+    parser.add_argument('--zsh', default=shutil.which('zsh') or 'zsh', help='zsh binary to profile')
+    parser.add_argument('-l', '--login', action='store_true', help='Profile a login shell (also sources .zprofile)')
+    parser.add_argument('--zprof', action='store_true', help='Also print zsh/zprof function profile of the last run')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE,
+                        help=f'Baseline file (default: {short_path(str(DEFAULT_BASELINE))})')
+    parser.add_argument('--save-baseline', action='store_true', help='Store this profile as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='Relative slowdown counted as regression (default: 0.2 = 20%%)')
+    parser.add_argument('--min-ms', type=float, default=5.0,
+                        help='Ignore differences smaller than this many ms (default: 5)')
+
+    args = parser.parse_args()
+
+    if args.runs < 1:
+        parser.error('--runs must be at least 1')
+
+    if shutil.which(args.zsh) is None:
+        print(f"{Colors.RED}❌ zsh not found: {args.zsh}{Colors.NC}")
+        sys.exit(1)
+
+    profiler = StartupProfiler(args.zsh, login=args.login, zprof=args.zprof)
+    runs = profiler.profile(args.runs, args.warmup)
+
+    if not any(r.commands for r in runs):
+        print(f"{Colors.RED}❌ No trace output captured - is {args.zsh} at least zsh 5.6?{Colors.NC}")
+        sys.exit(1)
+
+    report = Report(runs)
+    print_report(report, args.top)
+
+    if args.zprof and profiler.zprof_output:
+        print(f"\n{Colors.CYAN}═══ zprof (last run) ═══{Colors.NC}\n")
+        print('\n'.join(profiler.zprof_output.splitlines()[:args.top + 2]))
+
+    exit_code = 0
+    if args.baseline.exists() and not args.save_baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if compare_baseline(report, baseline, args.threshold, args.min_ms):
+            exit_code = 1
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report.to_baseline(), indent=2) + '\n')
+        print(f"\n{Colors.GREEN}✅ Baseline saved to {short_path(str(args.baseline))}{Colors.NC}")
+
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print(f"\n{Colors.YELLOW}⚠️  Interrupted by user{Colors.NC}")
+        sys.exit(130)